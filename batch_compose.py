@@ -0,0 +1,193 @@
+"""
+Start creating on Mon. Oct. 19, 2026
+author: koharite
+
+Headless batch compose of original image and layer image.
+Pairs images of org_img_dir and layer_img_dir by file name (without extension),
+and saves composed image to compose_img_dir using all CPU cores.
+
+Usage:
+    python batch_compose.py [--setting setting.json] [--workers N] [--transparency T] [--force]
+
+"""
+
+# import libraries
+from PySide2.QtGui import (QImage, QImageReader)
+
+import sys
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from image_array import qimage_to_array, array_to_qimage
+
+
+IMG_EXTS = ('.jpg', '.jpeg', '.png')
+# PNG text key to record layer alpha of composed image
+LAYER_ALPHA_KEY = 'layer_alpha'
+# Rows blended at once, keeps temporary arrays small on large images
+COMPOSE_BAND_ROWS = 256
+
+
+def list_images(dir_path):
+    # Return {bare name: file path} of image files in directory
+    images = {}
+    if not os.path.isdir(dir_path):
+        return images
+    for file_name in sorted(os.listdir(dir_path)):
+        bare_name, ext = os.path.splitext(file_name)
+        if ext.lower() in IMG_EXTS:
+            images.setdefault(bare_name, os.path.join(dir_path, file_name))
+    return images
+
+
+def make_pairs(org_img_dir, layer_img_dir, compose_img_dir):
+    # Pair original and layer image which have same bare name
+    org_imgs = list_images(org_img_dir)
+    layer_imgs = list_images(layer_img_dir)
+    pairs = []
+    for bare_name, org_path in org_imgs.items():
+        if bare_name in layer_imgs:
+            compose_path = os.path.join(compose_img_dir, bare_name + '.png')
+            pairs.append((org_path, layer_imgs[bare_name], compose_path))
+    return pairs
+
+
+def is_up_to_date(org_path, layer_path, compose_path, layer_alpha):
+    if not os.path.exists(compose_path):
+        return False
+    compose_mtime = os.path.getmtime(compose_path)
+    if compose_mtime < os.path.getmtime(org_path) or compose_mtime < os.path.getmtime(layer_path):
+        return False
+    # Composed with other transparency. QImageReader reads only header, not pixels.
+    return QImageReader(compose_path).text(LAYER_ALPHA_KEY) == str(layer_alpha)
+
+
+def compose_array(org_rgba, layer_rgba, layer_alpha):
+    # Blend layer on original with layer_alpha(0-255), same as drawing layer by SourceOver.
+    # Fully transparent layer pixels keep original pixels.
+    # Integer math on uint16 row bands: (org*(255-a) + layer*a + 127) // 255 fits in uint16.
+    alpha = np.uint16(layer_alpha)
+    inv_alpha = np.uint16(255 - layer_alpha)
+    compose = np.empty(org_rgba.shape[:2] + (4,), dtype=np.uint8)
+    compose[..., 3] = 255
+
+    for top in range(0, org_rgba.shape[0], COMPOSE_BAND_ROWS):
+        rows = slice(top, top + COMPOSE_BAND_ROWS)
+        blend = org_rgba[rows, :, :3].astype(np.uint16)
+        blend *= inv_alpha
+        layer = layer_rgba[rows, :, :3].astype(np.uint16)
+        layer *= alpha
+        blend += layer
+        blend += 127
+        # Same as blend // 255 for blend <= 65152, without integer division
+        blend += (blend >> 8) + 1
+        blend >>= 8
+        # Keep original under transparent layer pixels
+        transparent = layer_rgba[rows, :, 3:] == 0
+        compose[rows, :, :3] = np.where(transparent, org_rgba[rows, :, :3], blend)
+
+    return compose
+
+
+def compose_file(job):
+    # Worker function of process pool. Return (compose path, status, pixel count, message)
+    try:
+        return compose_file_impl(*job)
+    except Exception as e:
+        return (job[2], 'failed', 0, '{name}: {e}'.format(name=type(e).__name__, e=e))
+
+
+def compose_file_impl(org_path, layer_path, compose_path, layer_alpha, force):
+    if not force and is_up_to_date(org_path, layer_path, compose_path, layer_alpha):
+        return (compose_path, 'skipped', 0, '')
+
+    org_qimg = QImage(org_path)
+    layer_qimg = QImage(layer_path)
+    if org_qimg.isNull() or layer_qimg.isNull():
+        return (compose_path, 'failed', 0, 'can not load image')
+    if org_qimg.size() != layer_qimg.size():
+        message = 'size mismatch original {w1}x{h1}, layer {w2}x{h2}'.format( \
+            w1=org_qimg.width(), h1=org_qimg.height(), w2=layer_qimg.width(), h2=layer_qimg.height())
+        return (compose_path, 'failed', 0, message)
+
+    compose = compose_array(qimage_to_array(org_qimg), qimage_to_array(layer_qimg), layer_alpha)
+    compose_qimg = array_to_qimage(compose)
+    compose_qimg.setText(LAYER_ALPHA_KEY, str(layer_alpha))
+    if not compose_qimg.save(compose_path):
+        return (compose_path, 'failed', 0, 'can not save image')
+
+    return (compose_path, 'composed', org_qimg.width() * org_qimg.height(), '')
+
+
+def batch_compose(pairs, layer_alpha, workers, force=False):
+    jobs = [(org_path, layer_path, compose_path, layer_alpha, force) for org_path, layer_path, compose_path in pairs]
+    status_count = {'composed': 0, 'skipped': 0, 'failed': 0}
+    total_pixels = 0
+    # Report progress about 20 times
+    report_step = max(len(jobs) // 20, 1)
+    chunksize = max(len(jobs) // (workers * 8), 1)
+
+    done = 0
+    start_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            for compose_path, status, pixels, message in executor.map(compose_file, jobs, chunksize=chunksize):
+                done += 1
+                status_count[status] += 1
+                total_pixels += pixels
+                if status == 'failed':
+                    print('failed: {path}: {message}'.format(path=compose_path, message=message), file=sys.stderr)
+                if done % report_step == 0 or done == len(jobs):
+                    print('progress: {i}/{n}'.format(i=done, n=len(jobs)))
+    except BrokenProcessPool:
+        # A worker process died (e.g. crashed in image library), remaining images are not composed
+        print('failed: worker process terminated abruptly, {n} images are not processed'.format(n=len(jobs) - done), file=sys.stderr)
+        status_count['failed'] += len(jobs) - done
+    elapsed = time.perf_counter() - start_time
+
+    print('composed: {composed}, skipped: {skipped}, failed: {failed}'.format(**status_count))
+    if elapsed > 0 and status_count['composed'] > 0:
+        print('elapsed: {sec:.2f} s, throughput: {ips:.1f} images/s, {mps:.1f} Mpixel/s ({workers} workers)'.format( \
+            sec=elapsed, ips=status_count['composed'] / elapsed, mps=total_pixels / elapsed / 1e6, workers=workers))
+
+    return status_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compose original and layer images in batch')
+    parser.add_argument('--setting', default='setting.json', help='setting json file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--transparency', type=int, default=None, help='layer transparency value(0-100)')
+    parser.add_argument('--force', action='store_true', help='compose even if composed image is up to date')
+    args = parser.parse_args(argv)
+
+    # load setting json file
+    with open(args.setting) as f:
+        app_setting = json.load(f)
+
+    file_path = app_setting["SoftwareSetting"]["file_path"]
+    transparency = args.transparency
+    if transparency is None:
+        transparency = app_setting["SoftwareSetting"]["process"]["compose"]["transparency"]
+    if transparency < 0 or transparency > 100:
+        parser.error('transparency must be 0-100')
+    # Same conversion as transparency slider of main window
+    layer_alpha = int(255*(1.0-(transparency/100.0)))
+
+    os.makedirs(file_path["compose_img_dir"], exist_ok=True)
+    pairs = make_pairs(file_path["org_img_dir"], file_path["layer_img_dir"], file_path["compose_img_dir"])
+    print('{n} image pairs found'.format(n=len(pairs)))
+    if len(pairs) == 0:
+        return 0
+
+    status_count = batch_compose(pairs, layer_alpha, max(args.workers, 1), args.force)
+    return 1 if status_count['failed'] > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
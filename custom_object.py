@@ -7,10 +7,72 @@ Customized Object for Qt for Python (PySide2)
 """
 
 # import libraries
-from PySide2.QtCore import (Qt, Signal, QLineF)
+from PySide2.QtCore import (Qt, Signal, QLineF, QRectF)
 from PySide2.QtWidgets import (QGraphicsView, QGraphicsScene, QGraphicsItem)
 from PySide2.QtGui import (QColor, QPen)
 
+import time
+
+
+class GraphicsViewForMainView(QGraphicsView):
+    # Define custom signal of measured stroke latency message
+    latency_report = Signal(str)
+
+    def __init__(self, parent=None):
+        QGraphicsView.__init__(self, parent)
+        # Keep the background(original image, drawn by scene's drawBackground) in a cache pixmap,
+        # so repaint of a new pen segment doesn't draw the full resolution original again.
+        # Repaint region is the default MinimalViewportUpdate. There is no own frame timer,
+        # Qt merges pending updates into the next paint event.
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState)
+
+        # time of mouse events whose segment is not painted yet
+        self.pending_event_times = []
+        # latency(sec) from mouse event handler to end of viewport paint.
+        # Time for window system to show painted pixels is not included.
+        self.latencies = []
+        self.frame_time = 1.0 / 60.0
+        # stroke is finished but its last segments are not painted yet
+        self.stroke_finished = False
+
+    def mark_event(self, event_time):
+        if self.stroke_finished:
+            # Previous stroke was never painted, report it without unpainted segments
+            self.pending_event_times.clear()
+            self.report_latency()
+        self.pending_event_times.append(event_time)
+
+    def finish_stroke(self):
+        # Report after the last segments of stroke are painted
+        self.stroke_finished = True
+        if len(self.pending_event_times) == 0:
+            self.report_latency()
+
+    def paintEvent(self, event):
+        QGraphicsView.paintEvent(self, event)
+
+        if len(self.pending_event_times) != 0:
+            painted_time = time.perf_counter()
+            self.latencies.extend([painted_time - t for t in self.pending_event_times])
+            self.pending_event_times.clear()
+
+            if self.stroke_finished:
+                self.report_latency()
+
+    def report_latency(self):
+        # Emit message of measured stroke latency and reset measurement
+        self.stroke_finished = False
+        if len(self.latencies) == 0:
+            return
+        mean_ms = sum(self.latencies) / len(self.latencies) * 1000
+        max_ms = max(self.latencies) * 1000
+        over_frame = len([t for t in self.latencies if t > self.frame_time])
+        message = 'stroke paint latency: mean {mean:.1f} ms, max {max:.1f} ms, over 1 frame {over}/{n} segments'.format( \
+            mean=mean_ms, max=max_ms, over=over_frame, n=len(self.latencies))
+        self.latencies.clear()
+        self.latency_report.emit(message)
+
 
 class GraphicsSceneForMainView(QGraphicsScene):
 
@@ -32,6 +94,9 @@ class GraphicsSceneForMainView(QGraphicsScene):
 
         # added line's pen attribute
         self.pens = []
+
+        # original image drawn as background
+        self.background_pixmap = None
         
     def set_mode(self, mode):
         self.mode = mode
@@ -40,6 +105,28 @@ class GraphicsSceneForMainView(QGraphicsScene):
         # image data of Graphics Scene's contents
         self.img_contents = img_contents
 
+    def set_background_pixmap(self, pixmap):
+        self.background_pixmap = pixmap
+        self.setSceneRect(QRectF(pixmap.rect()))
+        # Background cache of view is not refreshed automatically
+        self.invalidate(self.sceneRect(), QGraphicsScene.BackgroundLayer)
+
+    def drawBackground(self, painter, rect):
+        QGraphicsScene.drawBackground(self, painter, rect)
+        if self.background_pixmap is not None:
+            # Draw only exposed area of original image
+            exposed_rect = rect.intersected(self.sceneRect())
+            painter.drawPixmap(exposed_rect, self.background_pixmap, exposed_rect)
+
+    def clear_lines(self):
+        # Remove drawn line items from scene
+        for item in self.line_items:
+            self.removeItem(item)
+        self.points.clear()
+        self.line_items.clear()
+        self.lines.clear()
+        self.pens.clear()
+
     def clear_contents(self):
         self.points.clear()
         self.line_items.clear()
@@ -81,6 +168,7 @@ class GraphicsSceneForMainView(QGraphicsScene):
                 self.points.append(pos)
 
     def mouseMoveEvent(self, event):
+        event_time = time.perf_counter()
         pos = event.scenePos()
         x = pos.x()
         y = pos.y()
@@ -108,12 +196,19 @@ class GraphicsSceneForMainView(QGraphicsScene):
                     self.line_items.append(self.addLine(QLineF(self.points[-1].x(), self.points[-1].y(), x, y), pen=pen))
                     self.lines.append(self.line_items[-1].line())
                     self.pens.append(pen)
+                    # Draw on layer image and update its statistics
+                    self.window.draw_layer_segment(self.lines[-1], pen)
+                    # Measure latency until this segment is painted
+                    self.parent.mark_event(event_time)
 
                 self.points.append(pos)
 
     def mouseReleaseEvent(self, event):
         self.points.clear()
 
+        if self.mode == 'pen' or self.mode == 'eraser':
+            self.parent.finish_stroke()
+
 
 # Class for graphics contents of tools on main window
 class GraphicsSceneForTools(QGraphicsScene):
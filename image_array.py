@@ -0,0 +1,128 @@
+"""
+Start creating on Mon. Oct. 19, 2026
+author: koharite
+
+Function of convert between QImage and numpy array, and exact pixel writing on layer image
+"""
+
+# import libraries
+from PySide2.QtCore import (Qt, QRectF)
+from PySide2.QtGui import (QImage, QPainter, QPen, QColor)
+
+import numpy as np
+
+
+def qimage_to_array(qimg):
+    # Return (height, width, 4) RGBA array.
+    # Array of Format_RGBA8888 qimg shares memory with qimg, so keep qimg alive while the array is used.
+    # Other formats are converted and copied.
+    if qimg.format() in (QImage.Format_Indexed8, QImage.Format_Mono, QImage.Format_MonoLSB):
+        return indexed_qimage_to_array(qimg)
+
+    if qimg.format() != QImage.Format_RGBA8888:
+        # Buffer doesn't hold reference to converted image, so copy it while converted is alive
+        converted = qimg.convertToFormat(QImage.Format_RGBA8888)
+        rgba = qimage_to_array(converted).copy()
+        return rgba
+
+    width = qimg.width()
+    height = qimg.height()
+    buf = np.frombuffer(qimg.constBits(), dtype=np.uint8, count=qimg.bytesPerLine() * height)
+    # Drop padding bytes at the end of each scan line
+    return buf.reshape(height, qimg.bytesPerLine())[:, :width * 4].reshape(height, width, 4)
+
+
+def qimage_to_writable_array(qimg):
+    # Return (height, width, 4) RGBA array to write pixels of Format_RGBA8888 qimg directly
+    width = qimg.width()
+    height = qimg.height()
+    buf = np.frombuffer(qimg.bits(), dtype=np.uint8, count=qimg.bytesPerLine() * height)
+    return buf.reshape(height, qimg.bytesPerLine())[:, :width * 4].reshape(height, width, 4)
+
+
+def indexed_qimage_to_array(qimg):
+    # Expand palette of indexed image with color table lookup
+    if qimg.format() != QImage.Format_Indexed8:
+        qimg = qimg.convertToFormat(QImage.Format_Indexed8)
+
+    width = qimg.width()
+    height = qimg.height()
+    buf = np.frombuffer(qimg.constBits(), dtype=np.uint8, count=qimg.bytesPerLine() * height)
+    indices = buf.reshape(height, qimg.bytesPerLine())[:, :width]
+
+    # Color table is list of QRgb(0xAARRGGBB)
+    table = np.array(qimg.colorTable(), dtype=np.uint32)
+    lut = np.zeros((256, 4), dtype=np.uint8)
+    lut[:len(table), 0] = (table >> 16) & 0xff
+    lut[:len(table), 1] = (table >> 8) & 0xff
+    lut[:len(table), 2] = table & 0xff
+    lut[:len(table), 3] = (table >> 24) & 0xff
+    # Look up one 4 byte word per pixel, faster than gathering 4 channels
+    return lut.view(np.uint32)[:, 0].take(indices).view(np.uint8).reshape(height, width, 4)
+
+
+def rgba_words(rgba):
+    # View (height, width, 4) RGBA array as (height, width) little endian words(0xAABBGGRR)
+    return np.ascontiguousarray(rgba).view('<u4')[..., 0]
+
+
+def words_rgba(words):
+    return words.astype('<u4', copy=False).view(np.uint8).reshape(words.shape + (4,))
+
+
+def normalize_layer_alpha(rgba, layer_alpha):
+    # Return copy of layer RGBA array whose alpha is layer_alpha(0-255)
+    words = rgba_words(rgba)
+    return words_rgba((words & 0x00ffffff) | np.uint32(int(layer_alpha) << 24))
+
+
+def import_layer_array(rgba, layer_alpha):
+    # Convert loaded layer RGBA array to layer buffer with layer_alpha(0-255).
+    # Layer image saved by this application has one alpha value for all pixels (0 at transparency 100),
+    # so its colors are kept as they are. Only when alpha differs between pixels,
+    # fully transparent pixels become background(black) like a new layer image.
+    words = rgba_words(rgba)
+    alpha = words >> 24
+    if alpha.size != 0 and alpha.min() != alpha.max():
+        words = np.where(alpha != 0, words & 0x00ffffff, np.uint32(0))
+    else:
+        words = words & 0x00ffffff
+    return words_rgba(words | np.uint32(int(layer_alpha) << 24))
+
+
+def segment_rect(layer_qimg, line, pen_width):
+    # Dirty rectangle(QRect) of line drawn with pen_width, clipped by layer image
+    half_size = int(pen_width/2) + 1
+    rect = QRectF(line.p1(), line.p2()).normalized().toAlignedRect()
+    rect = rect.adjusted(-half_size, -half_size, half_size, half_size)
+    return rect.intersected(layer_qimg.rect())
+
+
+def paint_segment(layer_qimg, rect, line, pen_width, rgb, layer_alpha):
+    # Overwrite pixels of line on Format_RGBA8888 layer image with exactly (rgb, layer_alpha).
+    # QPainter rounds color through premultiplied value on this format (and drops it at alpha 0),
+    # so QPainter draws only an opaque mask of rect, and pixels are written with numpy.
+    mask_qimg = QImage(rect.width(), rect.height(), QImage.Format_Grayscale8)
+    mask_qimg.fill(0)
+    painter = QPainter(mask_qimg)
+    painter.translate(-rect.left(), -rect.top())
+    painter.setPen(QPen(QColor(255, 255, 255), pen_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+    painter.drawLine(line)
+    painter.end()
+
+    buf = np.frombuffer(mask_qimg.constBits(), dtype=np.uint8, count=mask_qimg.bytesPerLine() * rect.height())
+    mask = buf.reshape(rect.height(), mask_qimg.bytesPerLine())[:, :rect.width()] != 0
+
+    rgba = qimage_to_writable_array(layer_qimg)[rect.top():rect.bottom()+1, rect.left():rect.right()+1]
+    words = rgba.view('<u4')[..., 0]
+    red, green, blue = rgb
+    words[mask] = red | (green << 8) | (blue << 16) | (int(layer_alpha) << 24)
+
+
+def array_to_qimage(rgba):
+    # Return deep copy QImage(Format_RGBA8888) of (height, width, 4) RGBA array
+    rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+    height, width = rgba.shape[:2]
+    qimg = QImage(rgba.data, width, height, width * 4, QImage.Format_RGBA8888)
+    # QImage doesn't own rgba's buffer, so copy it
+    return qimg.copy()
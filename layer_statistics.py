@@ -0,0 +1,97 @@
+"""
+Start creating on Mon. Oct. 19, 2026
+author: koharite
+
+Per-color(label) area statistics of layer image.
+Full count is computed once, after that only dirty rectangle of each stroke is recounted.
+"""
+
+# import libraries
+import numpy as np
+
+from image_array import (qimage_to_array, rgba_words)
+
+
+# Key of background(black, also eraser color) of layer image, it is not a label
+BACKGROUND_KEY = 0
+
+# Pixel count from which bincount(2^24 bins) is faster than sorting
+BINCOUNT_MIN_PIXELS = 1 << 20
+
+
+def pack_rgb(rgba):
+    # Pack R, G, B channel into one integer key(0xBBGGRR) per pixel (alpha is transparency, not label)
+    return rgba_words(rgba) & np.uint32(0x00ffffff)
+
+
+def unpack_rgb(key):
+    return (key & 0xff, (key >> 8) & 0xff, (key >> 16) & 0xff)
+
+
+def count_colors(rgba):
+    # Count pixels of each color
+    keys = pack_rgb(rgba).ravel()
+    if keys.size < BINCOUNT_MIN_PIXELS:
+        # Small region(dirty rectangle of stroke) is cheaper to count by sorting
+        return np.unique(keys, return_counts=True)
+
+    # Large image is counted in one pass with bincount over all RGB keys
+    counts = np.bincount(keys, minlength=1 << 24)
+    colors = np.nonzero(counts)[0]
+    return colors, counts[colors]
+
+
+class LayerStatistics:
+
+    def __init__(self):
+        # pixel count of each packed RGB color
+        self.counts = {}
+        self.total = 0
+
+    def reset(self, layer_qimg):
+        # Count all pixels of layer image
+        self.counts.clear()
+        rgba = qimage_to_array(layer_qimg)
+        self.total = rgba.shape[0] * rgba.shape[1]
+        self._apply(rgba, 1)
+
+    def reset_filled(self, width, height, rgb):
+        # Set statistics of layer image filled with one color without counting
+        self.total = width * height
+        self.counts = {int(pack_rgb(np.array([list(rgb) + [0]], dtype=np.uint8))[0]): self.total} if self.total > 0 else {}
+
+    def remove_region(self, layer_qimg, rect):
+        # Call before drawing on rect(QRect) of layer image
+        self._apply(self._region(layer_qimg, rect), -1)
+
+    def add_region(self, layer_qimg, rect):
+        # Call after drawing on rect(QRect) of layer image
+        self._apply(self._region(layer_qimg, rect), 1)
+
+    def labeled_count(self):
+        # Pixel count of all labels(not background)
+        return self.total - self.counts.get(BACKGROUND_KEY, 0)
+
+    def coverage(self):
+        # List of ((R, G, B), pixel count, percentage of image, percentage of labeled pixels)
+        # of each label, largest area first. Background is not included.
+        labeled = self.labeled_count()
+        if labeled == 0:
+            return []
+        items = sorted([item for item in self.counts.items() if item[0] != BACKGROUND_KEY], key=lambda item: item[1], reverse=True)
+        return [(unpack_rgb(key), count, count * 100.0 / self.total, count * 100.0 / labeled) for key, count in items]
+
+    def _region(self, layer_qimg, rect):
+        rgba = qimage_to_array(layer_qimg)
+        return rgba[rect.top():rect.bottom()+1, rect.left():rect.right()+1]
+
+    def _apply(self, rgba, sign):
+        if rgba.size == 0:
+            return
+        colors, counts = count_colors(rgba)
+        for key, count in zip(colors.tolist(), counts.tolist()):
+            count = self.counts.get(key, 0) + sign * count
+            if count > 0:
+                self.counts[key] = count
+            else:
+                self.counts.pop(key, None)
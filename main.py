@@ -19,11 +19,15 @@ from PySide2.QtGui import(QIcon, QImage, QPixmap, QPainter, QColor, QPen, QBrush
 import sys
 import os
 import json
+import time
 import pprint
 import numpy as np
 
 import colormap
-from custom_object import (GraphicsSceneForMainView, GraphicsSceneForTools)
+from image_array import (qimage_to_array, array_to_qimage, normalize_layer_alpha, import_layer_array, \
+    segment_rect, paint_segment)
+from layer_statistics import LayerStatistics
+from custom_object import (GraphicsViewForMainView, GraphicsSceneForMainView, GraphicsSceneForTools)
 
 # Main Window components
 class MainWindow(QMainWindow):
@@ -51,7 +55,11 @@ class MainWindow(QMainWindow):
         self.layer_pixmap = None
         self.layer_width = 0
         self.layer_height = 0
-        self.layer_alpha = 50.0
+        self.layer_alpha = 50
+
+        # Per-color area statistics of layer image
+        self.layer_stats = LayerStatistics()
+        self.layer_stats_max_rows = 10
 
         # Prepare color bar data
         self.colormap_gain = self.app_setting["SoftwareSetting"]["process"]["colormap"]["gain"]
@@ -95,6 +103,12 @@ class MainWindow(QMainWindow):
         self.org_img_open_button.triggered.connect(self.open_org_img_dialog)
         self.file_menu.addAction(self.org_img_open_button)
 
+        # Set "Layer Image Open" menu
+        self.layer_img_open_button = QAction(self.style().standardIcon(getattr(QStyle, 'SP_FileDialogStart')), 'Open Layer Image', self)
+        self.layer_img_open_button.setShortcut('Ctrl+L')
+        self.layer_img_open_button.triggered.connect(self.open_layer_img_dialog)
+        self.file_menu.addAction(self.layer_img_open_button)
+
         # Set "Save layer image" menu
         self.layer_img_save_button = QAction(self.style().standardIcon(getattr(QStyle, 'SP_FileDialogEnd')), 'Save Layer Image', self)
         self.layer_img_save_button.setShortcut('Ctrl+S')
@@ -120,9 +134,10 @@ class MainWindow(QMainWindow):
 
         # Set image display area
         self.gview_default_size = 500
-        self.graphics_view = QGraphicsView()
+        self.graphics_view = GraphicsViewForMainView()
         self.graphics_view.setFixedSize(self.gview_default_size, self.gview_default_size)
         self.graphics_view.setObjectName("imageDisplayArea")
+        self.graphics_view.latency_report.connect(self.statusBar().showMessage)
         self.upper_layout.addWidget(self.graphics_view)
 
         # image display area's contents
@@ -261,6 +276,12 @@ class MainWindow(QMainWindow):
         self.selected_color_layout.addRow(self.select_color_title_label, self.select_color_view)
         self.img_editor_layout.addLayout(self.selected_color_layout)
 
+        # Set area statistics view of layer image
+        self.layer_stats_title_label = QLabel('layer area statistics')
+        self.layer_stats_label = QLabel('')
+        self.img_status_layout.addWidget(self.layer_stats_title_label)
+        self.img_status_layout.addWidget(self.layer_stats_label)
+
         # Set save button
         self.save_button_layout = QHBoxLayout()
         self.img_status_layout.addLayout(self.save_button_layout)
@@ -330,11 +351,14 @@ class MainWindow(QMainWindow):
         self.layer_qimg.fill(QColor(0, 0, 0, self.layer_alpha))
         self.layer_pixmap = QPixmap.fromImage(self.layer_qimg)
 
+        # New layer image is filled with background color only
+        self.layer_stats.reset_filled(self.org_img_width, self.org_img_height, (0, 0, 0))
+        self.update_layer_stats_view()
+
         self.imgs.append(self.org_qimg)
         self.imgs.append(self.layer_qimg)
-        # Set image to scene
-        self.imgs_pixmap.append(QGraphicsPixmapItem(self.org_pixmap))
-        self.scene.addItem(self.imgs_pixmap[-1])
+        # Set original image as cached background of scene, and layer image as item
+        self.scene.set_background_pixmap(self.org_pixmap)
         self.imgs_pixmap.append(QGraphicsPixmapItem(self.layer_pixmap))
         self.scene.addItem(self.imgs_pixmap[-1])
 
@@ -346,17 +370,52 @@ class MainWindow(QMainWindow):
 
         self.show()
 
-    # Slot function of transparency slider changed
-    def transparency_change_sld(self, value):
-        self.img_transparency_edit.setText(str(value))
-        self.layer_alpha = int(255*(1.0-(value/100)))
+    # Layer image select Function
+    def open_layer_img_dialog(self):
+        if self.org_qimg is None:
+            QMessageBox.warning(self, 'Error', 'open original image before layer image', QMessageBox.Ok)
+            return
+
+        options = QFileDialog.Options()
+        layer_img_default_path = self.app_setting["SoftwareSetting"]["file_path"]["layer_img_dir"]
+        layer_img_file_path, selected_filter = QFileDialog.getOpenFileName(self, 'Select layer image', layer_img_default_path, \
+            'Image files(*.png)', options=options)
+        if layer_img_file_path == '':
+            return
+
+        self.load_layer_image(layer_img_file_path)
+
+    def load_layer_image(self, layer_img_file_path):
+        start_time = time.perf_counter()
+
+        layer_qimg = QImage(layer_img_file_path)
+        if layer_qimg.isNull():
+            QMessageBox.warning(self, 'Error', 'can not load layer image', QMessageBox.Ok)
+            return
+        if layer_qimg.size() != self.org_qimg.size():
+            message = 'layer image size {w1}x{h1} is different from original image size {w2}x{h2}'.format( \
+                w1=layer_qimg.width(), h1=layer_qimg.height(), w2=self.org_img_width, h2=self.org_img_height)
+            QMessageBox.warning(self, 'Error', message, QMessageBox.Ok)
+            return
+
+        # Strokes drawn before belong to previous layer
+        self.scene.clear_lines()
+
+        # Expand palette and set current transparency to all pixels
+        self.set_layer_image(import_layer_array(qimage_to_array(layer_qimg), self.layer_alpha))
+        self.layer_stats.reset(self.layer_qimg)
+        self.update_layer_stats_view()
+
+        elapsed = time.perf_counter() - start_time
+        self.statusBar().showMessage('layer image is loaded: {file} ({sec:.2f} s)'.format(file=layer_img_file_path, sec=elapsed))
+
+        self.show()
 
-        # Change layer image's transparency(alpha value)
-        for y in range(self.org_img_height):
-            for x in range(self.org_img_width):
-                self.layer_qimg.setPixelColor(QPoint(x, y), QColor(0, 0, 0, self.layer_alpha))
-                
+    # Replace layer image and its item on scene with RGBA array
+    def set_layer_image(self, layer_rgba):
+        self.layer_qimg = array_to_qimage(layer_rgba)
         self.layer_pixmap = QPixmap.fromImage(self.layer_qimg)
+        self.imgs[-1] = self.layer_qimg
 
         # remove previous layer image
         self.scene.removeItem(self.imgs_pixmap[-1])
@@ -366,30 +425,31 @@ class MainWindow(QMainWindow):
         self.imgs_pixmap.append(QGraphicsPixmapItem(self.layer_pixmap))
         self.scene.addItem(self.imgs_pixmap[-1])
 
-        self.show()
+    # Slot function of transparency slider changed
+    def transparency_change_sld(self, value):
+        # Edit slot is called by setText, but it does nothing because slider value is not changed
+        self.img_transparency_edit.setText(str(value))
+        self.change_layer_transparency(value)
 
     # Slot function of transparency text edit changed
     def transparency_change_edit(self, value):
         if int(value) < 0 or int(value) > 100:
             return
 
+        # Layer image is changed by slider slot
         self.img_transparency_sld.setValue(int(value))
-        self.layer_alpha = int(255*(1.0-(int(value)/100.0)))
 
-         # Change layer image's transparency(alpha value)
-        for y in range(self.org_img_height):
-            for x in range(self.org_img_width):
-                self.layer_qimg.setPixelColor(QPoint(x, y), QColor(0, 0, 0, self.layer_alpha))
-                
-        self.layer_pixmap = QPixmap.fromImage(self.layer_qimg)
+    def change_layer_transparency(self, transparency):
+        self.layer_alpha = int(255*(1.0-(transparency/100.0)))
 
-        # remove previous layer image
-        self.scene.removeItem(self.imgs_pixmap[-1])
-        self.imgs_pixmap.pop(-1)
+        if self.org_qimg is None:
+            return
 
-        # add new layer image to scene
-        self.imgs_pixmap.append(QGraphicsPixmapItem(self.layer_pixmap))
-        self.scene.addItem(self.imgs_pixmap[-1])
+        # Change layer image's transparency(alpha value), drawn colors are kept.
+        # Statistics count only colors, so they don't change.
+        self.set_layer_image(normalize_layer_alpha(qimage_to_array(self.layer_qimg), self.layer_alpha))
+        # Strokes are already drawn on layer image
+        self.scene.clear_lines()
 
         self.show()
 
@@ -442,90 +502,36 @@ class MainWindow(QMainWindow):
             return
         self.draw_thickness_sld.setValue(int(value))
 
-    def make_layer_image(self):
-        for i, line in enumerate(self.scene.lines):
-            pen = self.scene.pens[i]
-
-            pen_size = int(pen.width())
-            pen_color = pen.color()
-
-            # start pixel of line
-            x1 = int(line.x1())
-            y1 = int(line.y1())
-
-            # end pixel of line
-            x2 = int(line.x2())
-            y2 = int(line.y2())
-
-            dx = int(line.dx())
-            dy = int(line.dy())
-
-            # When only 1pixl line
-            if dx <= 1 and dy <= 1:
-                draw_pix_x1_s = max(x1 - int(pen_size/2), 0)
-                draw_pix_x1_e = min(x1 + int(pen_size/2), self.org_img_width-1)
-                draw_pix_y1_s = max(y1 - int(pen_size/2), 0)
-                draw_pix_y1_e = min(y1 + int(pen_size/2), self.org_img_height-1)
-
-                # for Pen's size
-                for y in range(draw_pix_y1_s, draw_pix_y1_e):
-                    for x in range(draw_pix_x1_s, draw_pix_x1_e):
-                        self.layer_qimg.setPixelColor(x, y, pen_color)
-
-                draw_pix_x2_s = max(x2 - int(pen_size/2), 0)
-                draw_pix_x2_e = min(x2 + int(pen_size/2), self.org_img_width-1)
-                draw_pix_y2_s = max(y2 - int(pen_size/2), 0)
-                draw_pix_y2_e = min(y2 + int(pen_size/2), self.org_img_height-1)
-
-                # for Pen's size
-                for y in range(draw_pix_y2_s, draw_pix_y2_e):
-                    for x in range(draw_pix_x2_s, draw_pix_x2_e):
-                        self.layer_qimg.setPixelColor(x, y, pen_color)
-
-            else:
-                # For avoid devide by 0
-                if dx == 0:
-                    for y in range(y1, y2+1):
-                        draw_pix_y_s = y - int(pen_size/2)
-                        draw_pix_y_e = y + int(pen_size/2)
-                        # for Pen's size
-                        for yy in range(draw_pix_y_s, draw_pix_y_e):
-                            self.layer_qimg.setPixelColor(x1, yy, pen_color)
-
-                else:
-                    grad = dy/dx
-
-                    # Choose coordinates with small slope not to skip pixels
-                    if grad >= 1.0:
-                        for x in range(dx):
-                            y = y1 + int(grad * x + 0.5)
-                            draw_pix_x_s = max(x1 + x - int(pen_size/2), 0)
-                            draw_pix_x_e = min(x1 + x + int(pen_size/2), self.org_img_width-1)
-                            draw_pix_y_s = max(y - int(pen_size/2), 0)
-                            draw_pix_y_e = min(y + int(pen_size/2), self.org_img_height-1)
-                            # for Pen's size
-                            for yy in range(draw_pix_y_s, draw_pix_y_e+1):
-                                for xx in range(draw_pix_x_s, draw_pix_x_e+1):
-                                    self.layer_qimg.setPixelColor(xx, yy, pen_color)
-
-                    else:
-                        for y in range(dy):
-                            x = x1 + int(1/grad * y + 0.5)
-                            draw_pix_y_s = max(y1 + y - int(pen_size/2), 0)
-                            draw_pix_y_e = min(y1 + y + int(pen_size/2), self.org_img_height-1)
-                            draw_pix_x_s = max(x - int(pen_size/2), 0)
-                            draw_pix_x_e = min(x + int(pen_size/2), self.org_img_width-1)
-                            # for Pen's size
-                            for yy in range(draw_pix_y_s, draw_pix_y_e+1):
-                                for xx in range(draw_pix_x_s, draw_pix_x_e+1):
-                                    self.layer_qimg.setPixelColor(xx, yy, pen_color)
+    # Draw a pen or eraser segment on layer image and update area statistics of its dirty rectangle
+    def draw_layer_segment(self, line, pen):
+        if self.org_qimg is None:
+            return
 
+        dirty_rect = segment_rect(self.layer_qimg, line, pen.width())
+        if dirty_rect.isEmpty():
+            return
 
-    # Slot function of save layer image button clicked
-    def save_layer_image(self):
+        self.layer_stats.remove_region(self.layer_qimg, dirty_rect)
 
-        self.make_layer_image()
+        # Overwrite pixels(not blend) with exact label color, layer image keeps one color per pixel
+        color = pen.color()
+        paint_segment(self.layer_qimg, dirty_rect, line, pen.width(), (color.red(), color.green(), color.blue()), self.layer_alpha)
 
+        self.layer_stats.add_region(self.layer_qimg, dirty_rect)
+        self.update_layer_stats_view()
+
+    # Show pixel count and coverage of each color on layer image
+    def update_layer_stats_view(self):
+        labeled = self.layer_stats.labeled_count()
+        labeled_percentage = labeled * 100.0 / self.layer_stats.total if self.layer_stats.total > 0 else 0.0
+        rows = ['labeled: {count} px ({percentage:.2f} % of image)'.format(count=labeled, percentage=labeled_percentage)]
+        for rgb, count, image_percentage, labeled_percentage in self.layer_stats.coverage()[:self.layer_stats_max_rows]:
+            rows.append('(R, G, B) = {RGB}: {count} px ({image:.2f} % of image, {labeled:.2f} % of labeled)'.format( \
+                RGB=rgb, count=count, image=image_percentage, labeled=labeled_percentage))
+        self.layer_stats_label.setText('\n'.join(rows))
+
+    # Slot function of save layer image button clicked
+    def save_layer_image(self):
         layer_img_default_path = self.app_setting["SoftwareSetting"]["file_path"]["layer_img_dir"]
         options = QFileDialog.Options()
         file_name, selected_filete = QFileDialog.getSaveFileName(self, 'Save layer image', layer_img_default_path, \
@@ -537,8 +543,6 @@ class MainWindow(QMainWindow):
 
     # Make composed orignal and layered image
     def make_compose_image(self):
-        self.make_layer_image()
-
         self.compose_qimg = QImage(self.org_img_width, self.org_img_height, QImage.Format_RGBA8888)
         painter = QPainter(self.compose_qimg)
 
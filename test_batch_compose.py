@@ -0,0 +1,29 @@
+"""
+Start creating on Mon. Oct. 19, 2026
+author: koharite
+
+Test of headless batch compose
+"""
+
+# import libraries
+import numpy as np
+
+import batch_compose
+from batch_compose import compose_array
+
+
+def test_compose_array_equals_rounded_blend():
+    rng = np.random.default_rng(0)
+    # More rows than one band
+    org = rng.integers(0, 256, (batch_compose.COMPOSE_BAND_ROWS + 30, 20, 4), dtype=np.uint8)
+    layer = rng.integers(0, 256, org.shape, dtype=np.uint8)
+    layer[::4, :, 3] = 0
+    transparent = layer[..., 3] == 0
+
+    for layer_alpha in (0, 51, 204, 255):
+        compose = compose_array(org, layer, layer_alpha)
+
+        ref = np.floor(org[..., :3] * (1 - layer_alpha/255) + layer[..., :3] * (layer_alpha/255) + 0.5)
+        ref[transparent] = org[..., :3][transparent]
+        assert (compose[..., :3] == ref).all()
+        assert (compose[..., 3] == 255).all()
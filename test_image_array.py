@@ -0,0 +1,81 @@
+"""
+Start creating on Mon. Oct. 19, 2026
+author: koharite
+
+Test of convert between QImage and numpy array
+"""
+
+# import libraries
+from PySide2.QtCore import QLineF
+from PySide2.QtGui import (QImage, QColor)
+
+import numpy as np
+
+from image_array import (qimage_to_array, array_to_qimage, indexed_qimage_to_array, rgba_words, \
+    normalize_layer_alpha, import_layer_array, segment_rect, paint_segment)
+
+
+def test_rgba_words_layout():
+    # Word of pixel is 0xAABBGGRR
+    rgba = np.array([[[0x11, 0x22, 0x33, 0x44]]], dtype=np.uint8)
+    assert rgba_words(rgba)[0, 0] == 0x44332211
+
+
+def test_array_qimage_round_trip():
+    rgba = np.random.default_rng(0).integers(0, 256, (7, 5, 4), dtype=np.uint8)
+    rgba[..., 3] = 255
+    assert (qimage_to_array(array_to_qimage(rgba)) == rgba).all()
+    # Other format is converted
+    argb = array_to_qimage(rgba).convertToFormat(QImage.Format_ARGB32)
+    assert (qimage_to_array(argb) == rgba).all()
+
+
+def test_indexed_palette_expansion():
+    qimg = QImage(9, 3, QImage.Format_Indexed8)
+    qimg.setColorTable([0x00000000, 0x80ff0000, 0xff00ff00])
+    qimg.fill(0)
+    qimg.setPixel(2, 1, 1)
+    qimg.setPixel(8, 2, 2)
+
+    rgba = indexed_qimage_to_array(qimg)
+    assert rgba.shape == (3, 9, 4)
+    assert list(rgba[0, 0]) == [0, 0, 0, 0]
+    assert list(rgba[1, 2]) == [255, 0, 0, 0x80]
+    assert list(rgba[2, 8]) == [0, 255, 0, 255]
+
+
+def test_normalize_layer_alpha_keeps_color():
+    rgba = np.array([[[200, 100, 50, 0], [10, 250, 3, 127]]], dtype=np.uint8)
+    normalized = normalize_layer_alpha(rgba, 204)
+    assert (normalized[..., :3] == rgba[..., :3]).all()
+    assert (normalized[..., 3] == 204).all()
+    # Input is not changed
+    assert rgba[0, 0, 3] == 0
+
+
+def test_import_layer_array_uniform_alpha_keeps_color():
+    # Layer saved at transparency 100 has alpha 0 for all pixels
+    rgba = np.array([[[255, 0, 0, 0], [0, 0, 0, 0]]], dtype=np.uint8)
+    imported = import_layer_array(rgba, 51)
+    assert list(imported[0, 0]) == [255, 0, 0, 51]
+    assert list(imported[0, 1]) == [0, 0, 0, 51]
+
+
+def test_import_layer_array_transparent_to_background():
+    rgba = np.array([[[255, 0, 0, 0], [0, 255, 0, 128]]], dtype=np.uint8)
+    imported = import_layer_array(rgba, 51)
+    assert list(imported[0, 0]) == [0, 0, 0, 51]
+    assert list(imported[0, 1]) == [0, 255, 0, 51]
+
+
+def test_paint_segment_exact_color():
+    for layer_alpha in (0, 127, 255):
+        qimg = QImage(40, 30, QImage.Format_RGBA8888)
+        qimg.fill(QColor(0, 0, 0, layer_alpha))
+        line = QLineF(-5, 3, 35, 25)
+        rect = segment_rect(qimg, line, 7)
+        paint_segment(qimg, rect, line, 7, (200, 100, 50), layer_alpha)
+
+        rgba = qimage_to_array(qimg)
+        colors = {tuple(pixel) for pixel in rgba.reshape(-1, 4).tolist()}
+        assert colors == {(0, 0, 0, layer_alpha), (200, 100, 50, layer_alpha)}
@@ -0,0 +1,73 @@
+"""
+Start creating on Mon. Oct. 19, 2026
+author: koharite
+
+Test of per-color(label) area statistics of layer image
+"""
+
+# import libraries
+from PySide2.QtCore import QLineF
+from PySide2.QtGui import (QImage, QColor)
+
+import numpy as np
+
+from image_array import (segment_rect, paint_segment)
+from layer_statistics import (LayerStatistics, BINCOUNT_MIN_PIXELS, pack_rgb, unpack_rgb, count_colors)
+
+
+def test_pack_rgb_key_layout():
+    # Key is 0xBBGGRR, alpha is ignored
+    rgba = np.array([[[0x11, 0x22, 0x33, 0x44]]], dtype=np.uint8)
+    key = int(pack_rgb(rgba)[0, 0])
+    assert key == 0x332211
+    assert unpack_rgb(key) == (0x11, 0x22, 0x33)
+
+
+def test_count_colors_small_and_large():
+    rng = np.random.default_rng(0)
+    # small region is counted by sorting, large image by bincount
+    for height in (10, BINCOUNT_MIN_PIXELS // 100 + 1):
+        rgba = (rng.integers(0, 3, (height, 100, 4)) * 80).astype(np.uint8)
+        colors, counts = count_colors(rgba)
+
+        keys = rgba[..., 0].astype(np.uint32) | (rgba[..., 1].astype(np.uint32) << 8) | (rgba[..., 2].astype(np.uint32) << 16)
+        ref_colors, ref_counts = np.unique(keys, return_counts=True)
+        assert (colors == ref_colors).all()
+        assert (counts == ref_counts).all()
+
+
+def test_incremental_equals_full_count():
+    layer_alpha = 127
+    qimg = QImage(120, 80, QImage.Format_RGBA8888)
+    qimg.fill(QColor(0, 0, 0, layer_alpha))
+    stats = LayerStatistics()
+    stats.reset_filled(120, 80, (0, 0, 0))
+
+    rng = np.random.default_rng(1)
+    colors = [(200, 100, 50), (10, 250, 3), (0, 0, 0)]
+    for i in range(100):
+        # segments cross edges of image
+        line = QLineF(*rng.uniform(-20, 140, 4))
+        width = int(rng.integers(1, 31))
+        rect = segment_rect(qimg, line, width)
+        if rect.isEmpty():
+            continue
+        stats.remove_region(qimg, rect)
+        paint_segment(qimg, rect, line, width, colors[i % 3], layer_alpha)
+        stats.add_region(qimg, rect)
+
+    incremental = dict(stats.counts)
+    stats.reset(qimg)
+    assert incremental == stats.counts
+
+
+def test_coverage_excludes_background():
+    stats = LayerStatistics()
+    stats.total = 100
+    # background(black): 80, red(0x0000ff): 15, green(0x00ff00): 5
+    stats.counts = {0: 80, 0x0000ff: 15, 0x00ff00: 5}
+
+    assert stats.labeled_count() == 20
+    coverage = stats.coverage()
+    assert [rgb for rgb, _, _, _ in coverage] == [(255, 0, 0), (0, 255, 0)]
+    assert coverage[0][1:] == (15, 15.0, 75.0)